@@ -1,125 +1,163 @@
-import requests
+import calendar
 import logging
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+# orjson is optional; fall back to the stdlib encoder when it is not installed
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+    _loads = orjson.loads
+except ImportError:
+    import json
+
+    def _dumps(obj):
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+    _loads = json.loads
+
+# Fields that are identical for every weekly invoice item
+_WEEK_TEMPLATE = {
+    "igstApplicable": True,
+    "sac": None,
+    "igst": None,
+    "cgst": None,
+    "sgst": None,
+    "unit": "HOUR"
+}
+
+def _generate_weekly_schedule(year, month, rate_per_hour, name):
+    # Build the weekly invoice items and their grand total in a single pass
+    schedule_list = []
+    grand_total = 0
+    first_day_weekday, days_in_month = calendar.monthrange(year, month)
+
+    # Step through Mondays (the first one may fall before the 1st) and clamp each week to the month
+    for monday in range(1 - first_day_weekday, days_in_month + 1, 7):
+        day = max(monday, 1)
+        end_day = min(monday + 4, days_in_month)  # Count only weekdays (Monday to Friday)
+        if end_day < day:
+            continue  # Month starts on a weekend
+        days_in_week = end_day - day + 1
+
+        description = f"{month:02d}-{day:02d}-{year:04d} - {month:02d}-{end_day:02d}-{year:04d}"
+        quantity = 8 * days_in_week
+        total = quantity * rate_per_hour
+
+        schedule_dict = {
+            **_WEEK_TEMPLATE,
+            "quantity": quantity,
+            "description": description,
+            "rate": rate_per_hour,
+            "name": name,
+            "total": total
+        }
+        schedule_list.append(schedule_dict)
+        grand_total += total
+
+    return schedule_list, grand_total
 
 def get_invoice_items(year, month, rate_per_hour, name):
-    # Function to find the first weekday of a given month and year that's not Saturday or Sunday
-    def get_first_weekday(year, month):
-        first_day = datetime(year, month, 1)
-        # Adjust if the first day is Saturday (5) or Sunday (6)
-        if first_day.weekday() == 5:
-            first_day += timedelta(days=2)
-        elif first_day.weekday() == 6:
-            first_day += timedelta(days=1)
-        return first_day
-
-    # Function to create the description for each week
-    def create_week_description(start_date, end_date):
-        return f"{start_date.strftime('%m-%d-%Y')} - {end_date.strftime('%m-%d-%Y')}"
-
-    # Function to generate the dictionary for each week
-    def generate_weekly_schedule(year, month, rate_per_hour):
-        schedule_list = []
-        first_weekday = get_first_weekday(year, month)
-        current_date = first_weekday
-
-        while current_date.month == month:
-            days_in_week = 0
-            week_end_date = current_date
-
-            # Count only weekdays (Monday to Friday)
-            while week_end_date.weekday() < 5 and week_end_date.month == month:
-                days_in_week += 1
-                week_end_date += timedelta(days=1)
-
-            week_end_date -= timedelta(days=1)  # Adjust end_date to the last weekday
-
-            description = create_week_description(current_date, week_end_date)
-            quantity = 8 * days_in_week
-            total = quantity * rate_per_hour
-
-            schedule_dict = {
-                "quantity": quantity,
-                "igstApplicable": True,
-                "description": description,
-                "sac": None,
-                "rate": rate_per_hour,
-                "igst": None,
-                "cgst": None,
-                "sgst": None,
-                "name": name,
-                "unit": "HOUR",
-                "total": total
-            }
-            schedule_list.append(schedule_dict)
-            current_date = week_end_date + timedelta(days=3)  # Move to the next Monday
-
-        return schedule_list
-
-    weekly_schedule = generate_weekly_schedule(year, month, rate_per_hour)
-    return [schedule for schedule in weekly_schedule]
-
-# Set up logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    schedule_list, _ = _generate_weekly_schedule(year, month, rate_per_hour, name)
+    return schedule_list
+
+logger = logging.getLogger(__name__)
 
 class SkydoAPI:
     BASE_URL = "https://dashboard.skydo.com/api/"
-    invoice_id = 0
-    clients = []
-    invoice_items = []
-    year = 2024
-    month = 4
+    # Endpoint templates, relative to BASE_URL
+    _EP_CREATE_INVOICE = "route?path=challan/create/invoice"
+    _EP_GET_DETAILS = "create-invoice/get-invoice-details?invoiceId={id}"
+    _EP_UPDATE_PREFIX = "create-invoice/update-invoice"
+    _EP_BILL_TO = _EP_UPDATE_PREFIX + "?path=challan/update/bill/to&invoiceId={id}"
+    _EP_ITEMS = _EP_UPDATE_PREFIX + "?path=/challan/update/items&invoiceId={id}"
+    _EP_OTHER_DETAILS = _EP_UPDATE_PREFIX + "?path=/challan/update/other/details&invoiceId={id}"
 
     def __init__(self, cookie_str, client_name, item_name, year=None, month=None):
-        logging.info("Initializing SkydoAPI with client_name=%s, item_name=%s, year=%s, month=%s", client_name, item_name, year, month)
-        if not year:
+        logger.debug("Initializing SkydoAPI with client_name=%s, item_name=%s, year=%s, month=%s", client_name, item_name, year, month)
+        self.invoice_id = 0
+        self.clients = []
+        self.invoice_items = []
+        self._clients_by_name = {}
+        self._items_by_name = {}
+        # Only look up the current date when the caller did not supply the full period
+        if not (year and month):
             current_date = datetime.now()
-            self.year = current_date.year
-            self.month = current_date.month
+            year = year or current_date.year
+            month = month or current_date.month
+        self.year = year
+        self.month = month
 
-        self.session = requests.Session()
-        self.session.headers.update({'x-server': 'CHALLAN'})
+        self.session = self._create_session()
         self.load_cookies(cookie_str)
         self.create_invoice()
         self.get_invoice_details()
-        for client in self.clients:
-            if client_name.lower() == client['name'].lower():
-                self.choose_client(client)
-                break
-        for item in self.invoice_items:
-            if item_name.lower() == item['name'].lower():
-                self.choose_items(item)
-                break
-        self.other_details()
-        self.finalize_invoice()
+        client = self._clients_by_name.get(client_name.lower())
+        if client is None:
+            raise ValueError(f"Client '{client_name}' not found in invoice details")
+        item = self._items_by_name.get(item_name.lower())
+        if item is None:
+            raise ValueError(f"Item '{item_name}' not found in invoice details")
+        # Bill-to, items and other details are independent sub-documents, so post them concurrently
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [
+                executor.submit(self.choose_client, client),
+                executor.submit(self.choose_items, item),
+                executor.submit(self.other_details)
+            ]
+            for future in as_completed(futures):
+                future.result()
+
+    def _create_session(self):
+        # Imported here so that loading the module (e.g. for get_invoice_items) stays cheap
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
+        session = requests.Session()
+        # Retry transient gateway errors. POST stays out of the default retry methods
+        # so create_invoice is never sent twice.
+        retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+        adapter = HTTPAdapter(max_retries=retry)
+        session.mount("https://", adapter)
+        # Invoice updates overwrite a sub-document, so repeating them is safe. The update
+        # adapter shares the base pool so every call reuses the same keep-alive connection.
+        update_adapter = HTTPAdapter(max_retries=retry.new(allowed_methods=["POST"]))
+        update_adapter.poolmanager = adapter.poolmanager
+        session.mount(self.BASE_URL + self._EP_UPDATE_PREFIX, update_adapter)
+        session.headers.update({'x-server': 'CHALLAN', 'Connection': 'keep-alive', 'Accept-Encoding': 'gzip'})
+        return session
 
     def load_cookies(self, cookie_str):
-        logging.info("Loading cookies")
-        cookies = {c.split('=')[0]: c.split('=')[1] for c in cookie_str.split('; ')}
-        for name, value in cookies.items():
-            self.session.cookies.set(name, value)
+        logger.debug("Loading cookies")
+        for part in cookie_str.split('; '):
+            name, sep, value = part.partition('=')
+            if sep:
+                self.session.cookies.set(name, value)
+
+    def _post_json(self, url, payload):
+        return self.session.post(url, data=_dumps(payload), headers={'Content-Type': 'application/json'})
 
     def create_invoice(self):
-        logging.info("Creating invoice")
-        endpoint = "route?path=challan/create/invoice"
-        url = f"{self.BASE_URL}/{endpoint}"
-        response = self.session.post(url).json()
-        self.invoice_id = response['data']
-        logging.info("Invoice created with ID=%s", self.invoice_id)
+        logger.debug("Creating invoice")
+        url = self.BASE_URL + self._EP_CREATE_INVOICE
+        self.invoice_id = _loads(self.session.post(url).content)['data']
+        logger.info("Invoice created with ID=%s", self.invoice_id)
 
     def get_invoice_details(self):
-        logging.info("Getting invoice details for invoice_id=%s", self.invoice_id)
-        endpoint = "create-invoice/get-invoice-details?invoiceId=" + str(self.invoice_id)
-        url = f"{self.BASE_URL}/{endpoint}"
-        response = self.session.get(url).json()
+        logger.debug("Getting invoice details for invoice_id=%s", self.invoice_id)
+        url = self.BASE_URL + self._EP_GET_DETAILS.format(id=self.invoice_id)
+        response = _loads(self.session.get(url).content)
         self.clients = response['data']['cacheDetails']['challanClients']
         self.invoice_items = response['data']['cacheDetails']['invoiceItems']
-        logging.info("Loaded clients and items from invoice details")
+        self._clients_by_name = {c['name'].lower(): c for c in self.clients}
+        self._items_by_name = {i['name'].lower(): i for i in self.invoice_items}
+        logger.debug("Loaded clients and items from invoice details")
 
     def choose_client(self, client):
-        logging.info("Choosing client: %s", client['name'])
-        endpoint = "create-invoice/update-invoice?path=challan/update/bill/to&invoiceId=" + str(self.invoice_id)
-        url = f"{self.BASE_URL}/{endpoint}"
+        logger.debug("Choosing client: %s", client['name'])
+        url = self.BASE_URL + self._EP_BILL_TO.format(id=self.invoice_id)
         payload = {
             "invoiceId": self.invoice_id,
             "name": client['name'],
@@ -131,22 +169,21 @@ class SkydoAPI:
             "gstinNotAvailable": False,
             "gstinVerified": False
         }
-        self.session.post(url, json=payload).json()
+        self._post_json(url, payload).raise_for_status()
 
     def choose_items(self, item):
-        logging.info("Choosing Item: %s", item['name'])
-        endpoint = "create-invoice/update-invoice?path=/challan/update/items&invoiceId=" + str(self.invoice_id)
-        url = f"{self.BASE_URL}/{endpoint}"
-        invoice_items = get_invoice_items(self.year, self.month, item['rate'], item['name'])
+        logger.debug("Choosing Item: %s", item['name'])
+        url = self.BASE_URL + self._EP_ITEMS.format(id=self.invoice_id)
+        invoice_items, sub_total = _generate_weekly_schedule(self.year, self.month, item['rate'], item['name'])
         payload = {
             "invoiceId": self.invoice_id,
             "invoiceFinancial": {
                 "currency": item['currency'],
-                "subTotal": sum(item['total'] for item in invoice_items),
+                "subTotal": sub_total,
                 "discountPercentage": 0,
                 "discountValue": None,
                 "platformFees": None,
-                "total": sum(item['total'] for item in invoice_items),
+                "total": sub_total,
                 "totalCgst": 0,
                 "totalSgst": 0,
                 "totalIgst": 0,
@@ -154,12 +191,11 @@ class SkydoAPI:
             },
             "invoiceItems": invoice_items
         }
-        self.session.post(url, json=payload).json()
+        self._post_json(url, payload).raise_for_status()
 
     def other_details(self):
-        logging.info("Updating other invoice details.")
-        endpoint = "create-invoice/update-invoice?path=/challan/update/other/details&invoiceId=" + str(self.invoice_id)
-        url = f"{self.BASE_URL}/{endpoint}"
+        logger.debug("Updating other invoice details.")
+        url = self.BASE_URL + self._EP_OTHER_DETAILS.format(id=self.invoice_id)
         payload = {
             "invoiceId": self.invoice_id,
             "includeLut": True,
@@ -168,5 +204,5 @@ class SkydoAPI:
             "lut": None,
             "others": {}
         }
-        self.session.post(url, json=payload).json()
-        logging.debug("Other details updated.")
+        self._post_json(url, payload).raise_for_status()
+        logger.debug("Other details updated.")
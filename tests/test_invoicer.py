@@ -0,0 +1,177 @@
+import json
+import unittest
+from datetime import datetime
+from unittest import mock
+
+from invoicer import SkydoAPI, get_invoice_items
+
+
+def summarize(items):
+    return [(w["description"], w["quantity"], w["total"]) for w in items]
+
+
+class GetInvoiceItemsTest(unittest.TestCase):
+    # Expected weeks were recorded from the original day-by-day implementation
+
+    def test_month_starting_on_saturday_with_28_days(self):
+        self.assertEqual(summarize(get_invoice_items(2025, 2, 25, "Dev")), [
+            ("02-03-2025 - 02-07-2025", 40, 1000),
+            ("02-10-2025 - 02-14-2025", 40, 1000),
+            ("02-17-2025 - 02-21-2025", 40, 1000),
+            ("02-24-2025 - 02-28-2025", 40, 1000),
+        ])
+
+    def test_month_starting_on_monday_with_28_days(self):
+        self.assertEqual(summarize(get_invoice_items(2021, 2, 25, "Dev")), [
+            ("02-01-2021 - 02-05-2021", 40, 1000),
+            ("02-08-2021 - 02-12-2021", 40, 1000),
+            ("02-15-2021 - 02-19-2021", 40, 1000),
+            ("02-22-2021 - 02-26-2021", 40, 1000),
+        ])
+
+    def test_month_starting_on_saturday_with_31_days(self):
+        self.assertEqual(summarize(get_invoice_items(2025, 3, 25, "Dev")), [
+            ("03-03-2025 - 03-07-2025", 40, 1000),
+            ("03-10-2025 - 03-14-2025", 40, 1000),
+            ("03-17-2025 - 03-21-2025", 40, 1000),
+            ("03-24-2025 - 03-28-2025", 40, 1000),
+            ("03-31-2025 - 03-31-2025", 8, 200),
+        ])
+
+    def test_month_starting_on_friday_with_31_days(self):
+        self.assertEqual(summarize(get_invoice_items(2024, 3, 25, "Dev")), [
+            ("03-01-2024 - 03-01-2024", 8, 200),
+            ("03-04-2024 - 03-08-2024", 40, 1000),
+            ("03-11-2024 - 03-15-2024", 40, 1000),
+            ("03-18-2024 - 03-22-2024", 40, 1000),
+            ("03-25-2024 - 03-29-2024", 40, 1000),
+        ])
+
+    def test_month_starting_on_sunday_with_float_rate(self):
+        self.assertEqual(summarize(get_invoice_items(2025, 6, 12.5, "Dev")), [
+            ("06-02-2025 - 06-06-2025", 40, 500.0),
+            ("06-09-2025 - 06-13-2025", 40, 500.0),
+            ("06-16-2025 - 06-20-2025", 40, 500.0),
+            ("06-23-2025 - 06-27-2025", 40, 500.0),
+            ("06-30-2025 - 06-30-2025", 8, 100.0),
+        ])
+
+    def test_item_fields(self):
+        self.assertEqual(get_invoice_items(2025, 6, 12.5, "Dev")[-1], {
+            "quantity": 8,
+            "igstApplicable": True,
+            "description": "06-30-2025 - 06-30-2025",
+            "sac": None,
+            "rate": 12.5,
+            "igst": None,
+            "cgst": None,
+            "sgst": None,
+            "name": "Dev",
+            "unit": "HOUR",
+            "total": 100.0
+        })
+
+
+class CreateSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = SkydoAPI.__new__(SkydoAPI)._create_session()
+
+    def adapter_for(self, endpoint):
+        return self.session.get_adapter(SkydoAPI.BASE_URL + endpoint.format(id=42))
+
+    def test_create_invoice_post_is_not_retried(self):
+        retries = self.adapter_for(SkydoAPI._EP_CREATE_INVOICE).max_retries
+        self.assertFalse(retries.is_retry("POST", 503))
+        self.assertTrue(retries.is_retry("GET", 503))
+
+    def test_update_posts_are_retried(self):
+        for endpoint in (SkydoAPI._EP_BILL_TO, SkydoAPI._EP_ITEMS, SkydoAPI._EP_OTHER_DETAILS):
+            with self.subTest(endpoint=endpoint):
+                self.assertTrue(self.adapter_for(endpoint).max_retries.is_retry("POST", 503))
+
+    def test_update_adapter_shares_connection_pool(self):
+        base = self.adapter_for(SkydoAPI._EP_CREATE_INVOICE)
+        update = self.adapter_for(SkydoAPI._EP_ITEMS)
+        self.assertIsNot(update, base)
+        self.assertIs(update.poolmanager, base.poolmanager)
+
+
+class FakeResponse:
+
+    def __init__(self, body):
+        self.content = json.dumps(body).encode()
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeCookies:
+
+    def __init__(self):
+        self.values = {}
+
+    def set(self, name, value):
+        self.values[name] = value
+
+
+class FakeSession:
+    # Answers create_invoice and get_invoice_details, and records every POST
+
+    def __init__(self):
+        self.cookies = FakeCookies()
+        self.posts = []
+
+    def post(self, url, data=None, headers=None):
+        self.posts.append(url)
+        return FakeResponse({"data": 42})
+
+    def get(self, url):
+        return FakeResponse({"data": {"cacheDetails": {
+            "challanClients": [{"name": "Acme Corp", "address": "1 Main St\nSpringfield", "country": "US"}],
+            "invoiceItems": [{"name": "Development", "rate": 25, "currency": "USD"}]
+        }}})
+
+
+class SkydoAPITest(unittest.TestCase):
+
+    def create(self, client_name="acme corp", item_name="DEVELOPMENT", **kwargs):
+        self.session = FakeSession()
+        with mock.patch.object(SkydoAPI, "_create_session", return_value=self.session):
+            return SkydoAPI("sid=abc", client_name, item_name, **kwargs)
+
+    def test_posts_all_updates(self):
+        api = self.create(year=2025, month=6)
+        self.assertEqual(api.invoice_id, 42)
+        self.assertEqual(len(self.session.posts), 4)
+
+    def test_missing_client_raises_before_updates(self):
+        with self.assertRaisesRegex(ValueError, "Client 'Globex'"):
+            self.create(client_name="Globex", year=2025, month=6)
+        self.assertEqual(self.session.posts, [SkydoAPI.BASE_URL + SkydoAPI._EP_CREATE_INVOICE])
+
+    def test_missing_item_raises_before_updates(self):
+        with self.assertRaisesRegex(ValueError, "Item 'Design'"):
+            self.create(item_name="Design", year=2025, month=6)
+        self.assertEqual(self.session.posts, [SkydoAPI.BASE_URL + SkydoAPI._EP_CREATE_INVOICE])
+
+    def test_load_cookies_keeps_equals_in_values(self):
+        api = SkydoAPI.__new__(SkydoAPI)
+        api.session = FakeSession()
+        api.load_cookies("sid=abc; token=YWJj==; flag; theme=dark")
+        self.assertEqual(api.session.cookies.values, {"sid": "abc", "token": "YWJj==", "theme": "dark"})
+
+    def test_explicit_period_is_used(self):
+        api = self.create(year=2023, month=2)
+        self.assertEqual((api.year, api.month), (2023, 2))
+
+    def test_year_and_month_default_independently(self):
+        now = datetime.now()
+        api = self.create(year=2023)
+        self.assertEqual((api.year, api.month), (2023, now.month))
+        api = self.create(month=2)
+        self.assertEqual((api.year, api.month), (now.year, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()